@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Correctness check and microbenchmark for the status classifier.
+
+Runs main.classify_json_response / main.classify_html (no HTTP involved) on
+the recorded responses in bench/corpus (cases.json lists each file with its
+HTTP code and the expected verdict; HTML pages get pad_kb of script filler
+where they say <!--pad-->, like the real ones). Every case is checked
+first: any verdict that differs from the expected one, or that changes when
+the body is read as a single chunk, is reported and the exit code is 1.
+Then each case is timed and the report shows classifications/s, bytes
+scanned per response (HTML stops at the first decisive marker in document
+order, so pages without one are read to the end or the byte cap) and the
+peak memory allocated while classifying one response (tracemalloc).
+
+  python bench/classifier_bench.py
+  python bench/classifier_bench.py --save before.json      # then change the parser...
+  python bench/classifier_bench.py --compare before.json   # ...and compare
+  python bench/classifier_bench.py --case html_ --chunk-kb 64 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import main
+
+CORPUS = os.path.join(HERE, "corpus")
+
+# one Instagram-style bootstrap script, ~1 KB; repeated for pad_kb
+FILLER = (
+    '<script type="application/json" data-content-len="1020" data-sjs>{"require":[["ScheduledServerJS",'
+    '"handle",null,[{"__bbox":{"define":[["PolarisSiteData",[],{"country_code":"US","device_id":"'
+    '0E3A7C44-5F1B-4C2A-9A3D-7B1E2F0C6D5A","hostname":"i.instagram.com","is_on_vpn":false},1],'
+    '["CurrentEnvironment",[],{"facebookdotcom":false,"messengerdotcom":false,"instagramdotcom":true,'
+    '"workplacedotcom":false},827],["BootloaderConfig",[],{"deferBootloads":true,"jsRetries":[200,500],'
+    '"jsRetryAbortNum":2,"jsRetryAbortTime":5,"silentDups":false,"timeout":60000,"tieredLoadingFromTier":'
+    '100,"hypStep4":false,"phdOn":false,"btCutoffIndex":1426,"fastPathForAlreadyRequired":true},329],'
+    '["CSSLoaderConfig",[],{"timeout":5000,"modulePrefix":"BLCSS:","forcePollForBootloader":false,'
+    '"loadEventSupported":true},619],["ServerNonce",[],{"ServerNonce":"kJ8m3qzR7bT1XwY2Lp0aVc"},141],'
+    '["SiteData",[],{"server_revision":1017449201,"client_revision":1017449201,"tier":"","push_phase":'
+    '"C3","pkg_cohort":"BP:DEFAULT","haste_session":"20103.BP:DEFAULT.2.0.0.0.0","pr":1,"haste_site":'
+    '"www","manifest_base_uri":"https://static.cdninstagram.com","be_one_ahead":false}]]}}]]]}</script>\n'
+)
+
+def load_cases(only: str = ""):
+    with open(os.path.join(CORPUS, "cases.json"), encoding="utf-8") as f:
+        cases = [c for c in json.load(f) if only in c["name"]]
+    for case in cases:
+        with open(os.path.join(CORPUS, case["file"]), "rb") as f:
+            body = f.read()
+        pad = (FILLER * case.get("pad_kb", 0)).encode()
+        case["body"] = body.replace(b"<!--pad-->", pad)
+        case.setdefault("username", "natgeo")
+    return cases
+
+def classify(case: dict, chunks, scan=None):
+    if case["kind"] == "json":
+        return main.classify_json_response(case["code"], case["body"], 0)
+    return main.classify_html(case["code"], chunks, case["username"], scan)
+
+def scanned_bytes(case: dict, chunks) -> int:
+    if case["kind"] == "json":
+        return len(case["body"]) if case["code"] == 200 else 0
+    scan = main.HtmlScan()
+    classify(case, chunks, scan)
+    return scan.scanned
+
+def time_case(case: dict, chunks, min_time: float) -> float:
+    """Classifications per second, calibrated to run for at least min_time."""
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            classify(case, chunks)
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            return n / elapsed
+        n *= 2 if elapsed < min_time / 10 else max(2, int(min_time / elapsed) + 1)
+
+def peak_alloc(case: dict, chunks) -> int:
+    classify(case, chunks)  # warm caches (regex, json) outside the measurement
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        classify(case, chunks)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+def run(args) -> int:
+    cases = load_cases(args.case)
+    chunk = args.chunk_kb * 1024
+    failures = 0
+    results = {}
+    for case in cases:
+        body = case["body"]
+        chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+        status, reason = classify(case, chunks)
+        whole = classify(case, [body])
+        ok = status == case["expect"] and (status, reason) == whole
+        failures += not ok
+        results[case["name"]] = {
+            "ok": ok,
+            "verdict": status,
+            "reason": reason,
+            "bytes": len(body),
+            "scanned": scanned_bytes(case, chunks),
+            "per_s": 0.0 if args.check_only else time_case(case, chunks, args.min_time),
+            "peak_alloc": 0 if args.check_only else peak_alloc(case, chunks),
+        }
+        if not ok:
+            print(f"FAIL {case['name']}: expected {case['expect']}, got {status} ({reason}); "
+                  f"as one chunk {whole[0]} ({whole[1]})", file=sys.stderr)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    if args.json:
+        for name, r in results.items():
+            print(json.dumps({"case": name, **r}))
+    else:
+        print(f"{'case':<28} {'ok':<4} {'bytes':>8} {'scanned':>8} {'class/s':>10} {'MB/s':>8} {'peak KB':>8}"
+              + ("   vs base" if baseline else ""))
+        for name, r in results.items():
+            line = (
+                f"{name:<28} {'ok' if r['ok'] else 'FAIL':<4} {r['bytes']:>8} {r['scanned']:>8} "
+                f"{r['per_s']:>10.0f} {r['per_s'] * r['scanned'] / 2**20:>8.1f} {r['peak_alloc'] / 1024:>8.1f}"
+            )
+            base = baseline.get(name)
+            if base and base.get("per_s"):
+                line += f"   {r['per_s'] / base['per_s']:>6.2f}x"
+            print(line)
+        if not args.check_only and results:
+            # the whole corpus once, weighted equally per case
+            mix = len(results) / sum(1.0 / r["per_s"] for r in results.values())
+            print(f"\n{len(results)} cases, {failures} failed; corpus mix {mix:.0f} classifications/s")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    return 1 if failures else 0
+
+def parse_args():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--case", default="", help="only cases whose name contains this")
+    ap.add_argument("--chunk-kb", type=int, default=16, help="HTML chunk size, like the streamed download")
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds each case is timed for")
+    ap.add_argument("--check-only", action="store_true", help="verify verdicts, skip timing")
+    ap.add_argument("--save", help="write per-case results as JSON")
+    ap.add_argument("--compare", help="show speed relative to a --save file")
+    ap.add_argument("--json", action="store_true", help="print one JSON line per case")
+    return ap.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
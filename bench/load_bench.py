@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline end-to-end load benchmark.
+
+Starts the Instagram and Telegram stubs (bench/stubs.py) in separate
+processes, points main.py at them, seeds a throwaway SQLite DB with N users
+subscribed to M targets and lets the real poller run check_and_notify_target
+(alerts fan out through the outbox dispatcher) for a fixed duration. Reports throughput, p50/p99 check latency, event-loop lag,
+DB write rate, notifications delivered and peak memory.
+
+  python bench/load_bench.py --users 5000 --targets 1000 --duration 30
+  python bench/load_bench.py --users 2000 --targets 2000 --p429 0.05 --page-kb 400 --no-cache
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+from telegram.ext import ApplicationBuilder
+
+import main
+from stubs import start_stub
+
+def pct(values, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def loop_lag_monitor(samples: list, period: float = 0.01):
+    """Record how late a period-second sleep wakes up (event-loop stall)."""
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(period)
+        samples.append(time.perf_counter() - t0 - period)
+
+def point_at_stubs(ig_port: int):
+    base = f"http://127.0.0.1:{ig_port}"
+    main.WEB_JSON_URLS[:] = [
+        base + "/api/v1/users/web_profile_info/?username={username}",
+        base + "/i/api/v1/users/web_profile_info/?username={username}",
+    ]
+    main.INSTAGRAM_URL_TEMPLATE = base + "/{username}/"
+
+async def seed_users(n_users: int, n_targets: int, interval_min: int):
+    targets = [(t + 1, f"target{t}") for t in range(n_targets)]
+    subs = [(uid, uid % n_targets + 1, interval_min) for uid in range(1, n_users + 1)]
+
+    def _seed(conn):
+        conn.executemany("INSERT OR IGNORE INTO targets (id, username) VALUES (?, ?)", targets)
+        conn.executemany(
+            "INSERT OR REPLACE INTO subscriptions (telegram_user_id, target_id, check_interval_minutes) "
+            "VALUES (?, ?, ?)",
+            subs,
+        )
+    await main.db.write_wait(_seed)
+
+async def run(args):
+    ig_proc, ig_port = start_stub(
+        "instagram", latency_ms=args.latency_ms, p403=args.p403, p429=args.p429,
+        page_kb=args.page_kb, flip=args.flip, ip_rate=args.ip_rate,
+    )
+    tg_proc, tg_port = start_stub("telegram", latency_ms=args.tg_latency_ms)
+    point_at_stubs(ig_port)
+    proxy_procs = []
+    for i in range(args.proxies):
+        proc, port = start_stub("proxy", name=f"p{i}")
+        proxy_procs.append(proc)
+        main.PROXIES.append(f"http://127.0.0.1:{port}")
+
+    if not args.keep_rate_limits:
+        main.RATE_LIMIT_INITIAL = main.RATE_LIMIT_MAX = 1e6
+        main.RATE_LIMIT_BURST = 1e6
+    if args.no_cache:
+        main.status_cache.ttl = main.status_cache.negative_ttl = 0
+    main.POLL_CONCURRENCY = args.concurrency
+    main.PARSE_POOL = args.parse_pool
+
+    tmpdir = tempfile.mkdtemp(prefix="instamonitor-bench-")
+    main.DB_PATH = os.path.join(tmpdir, "bench.db")
+    main.DEFAULT_INTERVAL_MIN = main.MIN_INTERVAL
+
+    app = (
+        ApplicationBuilder()
+        .token("123456:BENCH")
+        .base_url(f"http://127.0.0.1:{tg_port}/bot")
+        .build()
+    )
+    await app.initialize()
+    await main.db_init()
+    await seed_users(args.users, args.targets, main.MIN_INTERVAL)
+    main.http_client = main.build_http_client()
+
+    latencies = []
+    lag = []
+
+    async def timed_check(target_id: int):
+        t0 = time.perf_counter()
+        await main.check_and_notify_target(target_id)
+        latencies.append(time.perf_counter() - t0)
+
+    main.notifier = main.NotificationDispatcher(app)
+    main.notifier.start()
+    main.poller = main.Poller(timed_check, concurrency=args.concurrency)
+    # every target once per --interval seconds, first runs spread over --spread
+    now = time.monotonic()
+    rows = await main.db_target_schedules()
+    for i, row in enumerate(rows):
+        first = now + (args.spread * i / max(1, len(rows)))
+        main.poller.schedule(row["target_id"], args.interval, first_due=first)
+
+    monitor = asyncio.create_task(loop_lag_monitor(lag))
+    writes0, txns0 = main.db.writes, main.db.transactions
+    t_start = time.perf_counter()
+    main.poller.start()
+    await asyncio.sleep(args.duration)
+    elapsed = time.perf_counter() - t_start
+    writes = main.db.writes - writes0
+    txns = main.db.transactions - txns0
+    await main.poller.stop()
+    # give the outbox a moment to drain what the last checks queued
+    for _ in range(50):
+        if not await main.db_outbox_size():
+            break
+        await asyncio.sleep(0.1)
+    outbox_left = await main.db_outbox_size()
+    await main.notifier.stop()
+    monitor.cancel()
+
+    async with httpx.AsyncClient() as c:
+        tg_stats = (await c.get(f"http://127.0.0.1:{tg_port}/stats")).json()
+
+    decisive = await main.db.read(
+        lambda conn: conn.execute("SELECT COUNT(*) FROM history WHERE status != 0").fetchone()[0]
+    )
+    await app.shutdown()
+    await main.close_http_client()
+    await main.close_db()
+    main.close_parse_executor()
+    ig_proc.terminate()
+    tg_proc.terminate()
+    for proc in proxy_procs:
+        proc.terminate()
+
+    report = {
+        "users": args.users,
+        "targets": args.targets,
+        "duration_s": round(elapsed, 2),
+        "checks": len(latencies),
+        "checks_per_s": round(len(latencies) / elapsed, 1),
+        "instagram_probes": main.probe_stats["probes"],
+        "dedup_ratio": round(main.dedup_ratio(), 3),
+        "cache_hits": main.status_cache.hits,
+        "check_p50_ms": round(pct(latencies, 0.50) * 1000, 1),
+        "check_p99_ms": round(pct(latencies, 0.99) * 1000, 1),
+        "loop_lag_p50_ms": round(pct(lag, 0.50) * 1000, 2),
+        "loop_lag_p99_ms": round(pct(lag, 0.99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lag, default=0.0) * 1000, 2),
+        "decisive_share": round(decisive / max(1, len(latencies)), 3),
+        "parsed_inline": main.parse_stats["inline"],
+        "parsed_in_pool": main.parse_stats["offloaded"],
+        "db_writes_per_s": round(writes / elapsed, 1),
+        "db_writes_per_txn": round(writes / max(1, txns), 1),
+        "notifications": tg_stats["sent"],
+        "outbox_left": outbox_left,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        width = max(len(k) for k in report)
+        for k, v in report.items():
+            print(f"{k:<{width}}  {v}")
+
+def parse_args():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--targets", type=int, default=500)
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    ap.add_argument("--interval", type=float, default=10.0, help="seconds between checks of one target")
+    ap.add_argument("--spread", type=float, default=5.0, help="seconds over which first runs are spread")
+    ap.add_argument("--concurrency", type=int, default=main.POLL_CONCURRENCY)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="stub Instagram latency")
+    ap.add_argument("--tg-latency-ms", type=float, default=20.0, help="stub Telegram latency")
+    ap.add_argument("--p403", type=float, default=0.0)
+    ap.add_argument("--p429", type=float, default=0.0)
+    ap.add_argument("--page-kb", type=int, default=300, help="profile HTML size")
+    ap.add_argument("--flip", type=float, default=0.01, help="chance a probe sees a status change")
+    ap.add_argument("--parse-pool", choices=["", "thread", "process"], default="",
+                    help="decode/classify large bodies off the event loop")
+    ap.add_argument("--proxies", type=int, default=0, help="route probes through N local proxy stubs")
+    ap.add_argument("--ip-rate", type=float, default=0.0, help="stub Instagram: req/s per egress before 429")
+    ap.add_argument("--no-cache", action="store_true", help="disable the status cache")
+    ap.add_argument("--keep-rate-limits", action="store_true", help="keep the AIMD limits from main.py")
+    ap.add_argument("--json", action="store_true", help="print one JSON line")
+    return ap.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
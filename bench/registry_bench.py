@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Memory and read-speed benchmark for the in-memory registry.
+
+Seeds a throwaway SQLite DB with N users subscribed to M targets, loads the
+registry from it and reports load time, memory (the registry's own estimate
+and what tracemalloc saw during the load), bytes per user, and user lookups
+per second from memory vs. through the SQLite thread.
+
+  python bench/registry_bench.py --users 100000 --targets 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import main
+
+async def run(args):
+    tmpdir = tempfile.mkdtemp(prefix="instamonitor-bench-")
+    main.DB_PATH = os.path.join(tmpdir, "bench.db")
+    await main.db_init()
+
+    def _seed(conn):
+        conn.executemany(
+            "INSERT INTO targets (id, username, last_known_status, last_checked_at) VALUES (?, ?, 'ACTIVE', ?)",
+            [(t, f"target_account_{t}", "2026-01-01T00:00:00+00:00") for t in range(1, args.targets + 1)],
+        )
+        conn.executemany(
+            "INSERT INTO subscriptions (telegram_user_id, target_id, last_known_status, check_interval_minutes) "
+            "VALUES (?, ?, 'ACTIVE', 15)",
+            [(1_000_000_000 + u, u % args.targets + 1) for u in range(args.users)],
+        )
+    await main.db.write_wait(_seed)
+    uids = [1_000_000_000 + u for u in range(args.users)]
+
+    tracemalloc.start()
+    registry = main.Registry()
+    await registry.load()
+    traced, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # load again untraced for a fair time
+    registry = main.Registry()
+    await registry.load()
+
+    t0 = time.perf_counter()
+    for uid in uids:
+        registry.user(uid)
+    mem_rate = len(uids) / (time.perf_counter() - t0)
+
+    sample = uids[: args.db_reads]
+    t0 = time.perf_counter()
+    for uid in sample:
+        await main.db_get_user(uid)
+    db_rate = len(sample) / (time.perf_counter() - t0)
+    await main.close_db()
+
+    estimate = registry.footprint()
+    report = {
+        "users": args.users,
+        "targets": args.targets,
+        "load_s": round(registry.load_seconds, 3),
+        "estimated_mb": round(estimate / 2**20, 1),
+        "traced_mb": round(traced / 2**20, 1),
+        "bytes_per_user": estimate // max(1, args.users),
+        "memory_reads_per_s": round(mem_rate),
+        "sqlite_reads_per_s": round(db_rate),
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        width = max(len(k) for k in report)
+        for k, v in report.items():
+            print(f"{k:<{width}}  {v}")
+
+def parse_args():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=100000)
+    ap.add_argument("--targets", type=int, default=20000)
+    ap.add_argument("--db-reads", type=int, default=5000, help="lookups timed through SQLite")
+    ap.add_argument("--json", action="store_true", help="print one JSON line")
+    return ap.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
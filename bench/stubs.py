@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local stand-ins for the services the bot talks to, for offline benchmarks.
+
+  instagram  – web_profile_info JSON endpoints (/api/v1/... and /i/api/v1/...)
+               and profile HTML pages (/<username>/), with configurable
+               latency, 403/429 ratios, page size and status flapping
+  telegram   – the Bot API subset the bot uses (getMe, sendMessage, ...),
+               counting delivered messages; GET /stats returns the counters
+  proxy      – plain HTTP forward proxy that tags requests with X-Egress, so
+               the instagram stub can throttle per egress (--ip-rate)
+
+Run standalone:
+  python bench/stubs.py instagram --port 8081 --latency-ms 80 --p429 0.02
+  python bench/stubs.py telegram --port 8082
+  python bench/stubs.py proxy --port 8090 --name p1
+
+Or from a harness: start_stub("instagram", latency_ms=80) -> (process, port)
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import zlib
+from typing import Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+
+from main import read_http_request
+
+MAX_BODY = 64 * 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 429: "Too Many Requests"}
+
+# ---------- Minimal HTTP/1.1 server ----------
+async def serve_http(handler, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+    """
+    Keep-alive HTTP/1.1 server good enough for httpx clients, on the
+    webhook's request parser (main.read_http_request).
+    handler(method, target, headers, body) -> (status, content_type, payload)
+    """
+
+    async def on_conn(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_http_request(reader, MAX_BODY)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                if body is None:
+                    break
+                status, ctype, payload = await handler(method, target, headers, body)
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {REASONS.get(status, 'Status')}\r\n"
+                        f"Content-Type: {ctype}\r\n"
+                        f"Content-Length: {len(payload)}\r\n"
+                        "\r\n"
+                    ).encode("latin-1")
+                    + payload
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(on_conn, host, port, backlog=1024)
+
+# ---------- Instagram ----------
+class InstagramStub:
+    """
+    Usernames starting with "gone" (or a hash-chosen gone_ratio share) are
+    deactivated; every request may flip a username's state with probability
+    flip, to exercise change notifications. With ip_rate, each egress (the
+    X-Egress header set by the proxy stub, else "direct") gets that many
+    requests per second before it sees 429s, like Instagram's per-IP limits.
+    """
+
+    def __init__(self, latency_ms=50.0, p403=0.0, p429=0.0, page_kb=300, gone_ratio=0.1, flip=0.0, seed=1,
+                 ip_rate=0.0):
+        self.latency = latency_ms / 1000.0
+        self.p403 = p403
+        self.p429 = p429
+        self.page_kb = page_kb
+        self.gone_ratio = gone_ratio
+        self.flip = flip
+        self.rng = random.Random(seed)
+        self.state = {}  # username -> active?
+        self.requests = 0
+        self.ip_rate = ip_rate
+        self._buckets = {}  # egress -> (tokens, last refill)
+        self._padding = b"<script>" + b"x" * 1024 + b"</script>\n"
+
+    def _over_ip_rate(self, egress: str) -> bool:
+        now = time.monotonic()
+        tokens, last = self._buckets.get(egress, (self.ip_rate, now))
+        tokens = min(self.ip_rate, tokens + (now - last) * self.ip_rate)
+        over = tokens < 1.0
+        self._buckets[egress] = (tokens if over else tokens - 1.0, now)
+        return over
+
+    def _active(self, username: str) -> bool:
+        active = self.state.get(username)
+        if active is None:
+            gone = username.startswith("gone") or (zlib.crc32(username.encode()) % 1000) < self.gone_ratio * 1000
+            active = not gone
+        if self.flip and self.rng.random() < self.flip:
+            active = not active
+        self.state[username] = active
+        return active
+
+    def _profile_page(self, username: str, active: bool) -> bytes:
+        if active:
+            head = (
+                "<!DOCTYPE html><html><head><title>@%s • Instagram</title>"
+                '<meta property="og:url" content="https://www.instagram.com/%s/" />'
+                '<link rel="canonical" href="https://www.instagram.com/%s/" />'
+                "</head><body>" % (username, username, username)
+            ).encode()
+        else:
+            head = b"<!DOCTYPE html><html><head><title>Instagram</title></head><body>"
+        body = self._padding * max(0, self.page_kb)
+        if not active:
+            body += b"<h2>Sorry, this page isn't available.</h2>"
+        return head + body + b"</body></html>"
+
+    async def handle(self, method, target, headers, body):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        if self.ip_rate and self._over_ip_rate(headers.get("x-egress", "direct")):
+            return 429, "application/json", b'{"message":"Please wait a few minutes","status":"fail"}'
+        r = self.rng.random()
+        if r < self.p429:
+            return 429, "application/json", b'{"message":"Please wait a few minutes","status":"fail"}'
+        if r < self.p429 + self.p403:
+            return 403, "application/json", b'{"message":"login_required","status":"fail"}'
+        parts = urlsplit(target)
+        if parts.path.endswith("/web_profile_info/"):
+            username = parse_qs(parts.query).get("username", [""])[0].lower()
+            if not self._active(username):
+                return 404, "application/json", b'{"data":{"user":null},"status":"ok"}'
+            payload = {"data": {"user": {"username": username, "id": str(zlib.crc32(username.encode()))}}, "status": "ok"}
+            return 200, "application/json", json.dumps(payload).encode()
+        username = parts.path.strip("/").lower()
+        if not username:
+            return 404, "text/html", b"not found"
+        return 200, "text/html; charset=utf-8", self._profile_page(username, self._active(username))
+
+# ---------- Telegram ----------
+class TelegramStub:
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000.0
+        self.sent = 0
+        self.calls = 0
+        self.started = time.time()
+
+    async def handle(self, method, target, headers, body):
+        path = urlsplit(target).path
+        if path == "/stats":
+            stats = {"sent": self.sent, "calls": self.calls, "uptime": time.time() - self.started}
+            return 200, "application/json", json.dumps(stats).encode()
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        api_method = path.rsplit("/", 1)[-1]
+        params = {}
+        if body:
+            if headers.get("content-type", "").startswith("application/json"):
+                params = json.loads(body)
+            else:
+                params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        if api_method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        elif api_method in ("sendMessage", "editMessageText"):
+            self.sent += api_method == "sendMessage"
+            chat_id = int(params.get("chat_id", 0))
+            result = {
+                "message_id": self.calls,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return 200, "application/json", json.dumps({"ok": True, "result": result}).encode()
+
+# ---------- Forward proxy ----------
+class ProxyStub:
+    """Forwards absolute-form GETs (what httpx sends to an HTTP proxy) upstream, adding X-Egress."""
+
+    def __init__(self, name="proxy"):
+        self.name = name
+        self.forwarded = 0
+        self.client = None
+
+    async def handle(self, method, target, headers, body):
+        if self.client is None:
+            self.client = httpx.AsyncClient(limits=httpx.Limits(max_connections=200))
+        if not target.startswith("http"):
+            return 400, "text/plain", b"absolute URL expected"
+        self.forwarded += 1
+        fwd = {k: v for k, v in headers.items() if k not in ("host", "proxy-connection", "connection", "content-length")}
+        fwd["x-egress"] = self.name
+        resp = await self.client.request(method, target, headers=fwd, content=body)
+        return resp.status_code, resp.headers.get("content-type", "application/octet-stream"), resp.content
+
+# ---------- Process helpers ----------
+STUBS = {"instagram": InstagramStub, "telegram": TelegramStub, "proxy": ProxyStub}
+
+async def _run(kind: str, port: int, opts: dict, ready=None):
+    stub = STUBS[kind](**opts)
+    server = await serve_http(stub.handle, port=port)
+    bound = server.sockets[0].getsockname()[1]
+    if ready is not None:
+        ready.put(bound)
+    else:
+        print(f"{kind} stub listening on http://127.0.0.1:{bound}")
+    async with server:
+        await server.serve_forever()
+
+def _child(kind, port, opts, ready):
+    asyncio.run(_run(kind, port, opts, ready))
+
+def start_stub(kind: str, port: int = 0, **opts) -> Tuple[multiprocessing.Process, int]:
+    """Run a stub in its own process (so it doesn't share the bot's event loop)."""
+    ready = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_child, args=(kind, port, opts, ready), daemon=True)
+    proc.start()
+    return proc, ready.get(timeout=10)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("kind", choices=sorted(STUBS))
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--latency-ms", type=float, default=None)
+    ap.add_argument("--p403", type=float, default=None)
+    ap.add_argument("--p429", type=float, default=None)
+    ap.add_argument("--page-kb", type=int, default=None)
+    ap.add_argument("--gone-ratio", type=float, default=None)
+    ap.add_argument("--flip", type=float, default=None)
+    ap.add_argument("--ip-rate", type=float, default=None, help="instagram: req/s per egress before 429")
+    ap.add_argument("--name", default=None, help="proxy: value sent as X-Egress")
+    args = ap.parse_args()
+    opts = {k: v for k, v in vars(args).items() if k not in ("kind", "port") and v is not None}
+    asyncio.run(_run(args.kind, args.port, opts))
+
+if __name__ == "__main__":
+    main()
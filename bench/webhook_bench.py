@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline webhook test: runs the bot in webhook mode against the Telegram stub
+(bench/stubs.py) and POSTs synthetic /start, /current and /history
+updates to the local webhook, the way Telegram would. Reports how fast
+updates are accepted and answered, and checks that a wrong secret token is
+refused.
+
+  python bench/webhook_bench.py --updates 2000 --connections 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+from telegram.ext import ApplicationBuilder
+
+import main
+from load_bench import pct
+from stubs import start_stub
+
+SECRET = "bench-secret"
+
+def sample_update(update_id: int, user_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}],
+        },
+    }
+
+async def wait_for_replies(tg: httpx.AsyncClient, stats_url: str, expected: int, timeout: float) -> int:
+    deadline = time.perf_counter() + timeout
+    sent = 0
+    while time.perf_counter() < deadline:
+        sent = (await tg.get(stats_url)).json()["sent"]
+        if sent >= expected:
+            break
+        await asyncio.sleep(0.02)
+    return sent
+
+async def run(args):
+    tg_proc, tg_port = start_stub("telegram", latency_ms=args.tg_latency_ms)
+    main.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="instamonitor-webhook-"), "bench.db")
+    main.WEBHOOK_PORT = 0
+    main.METRICS_PORT = 0
+    app = (
+        ApplicationBuilder()
+        .token("123456:BENCH")
+        .base_url(f"http://127.0.0.1:{tg_port}/bot")
+        .concurrent_updates(main.CONCURRENT_UPDATES)
+        .build()
+    )
+    main.register_handlers(app)
+    server = await main.start_webhook(app, SECRET)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}{main.WEBHOOK_PATH}"
+    stats_url = f"http://127.0.0.1:{tg_port}/stats"
+
+    limits = httpx.Limits(max_connections=args.connections)
+    async with httpx.AsyncClient(limits=limits) as client, httpx.AsyncClient() as tg:
+        bad = await client.post(url, content=json.dumps(sample_update(0, 1, "/start")),
+                                headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"})
+        sent0 = (await tg.get(stats_url)).json()["sent"]
+
+        post_latency = []
+        commands = ["/start", "/current", "/history"]
+        sem = asyncio.Semaphore(args.connections)
+
+        async def post(i: int):
+            body = json.dumps(sample_update(i + 1, 1000 + i, commands[i % len(commands)]))
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post(url, content=body, headers={
+                    "X-Telegram-Bot-Api-Secret-Token": SECRET, "Content-Type": "application/json",
+                })
+                post_latency.append(time.perf_counter() - t0)
+                r.raise_for_status()
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(post(i) for i in range(args.updates)))
+        accepted_in = time.perf_counter() - t_start
+        sent = await wait_for_replies(tg, stats_url, sent0 + args.updates, timeout=60) - sent0
+        answered_in = time.perf_counter() - t_start
+
+    await main.stop_webhook(app, server)
+    tg_proc.terminate()
+
+    report = {
+        "updates": args.updates,
+        "bad_secret_status": bad.status_code,
+        "accepted_per_s": round(args.updates / accepted_in, 1),
+        "post_p50_ms": round(pct(post_latency, 0.50) * 1000, 2),
+        "post_p99_ms": round(pct(post_latency, 0.99) * 1000, 2),
+        "replies": sent,
+        "answered_per_s": round(sent / answered_in, 1),
+        "all_answered_s": round(answered_in, 2),
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        width = max(len(k) for k in report)
+        for k, v in report.items():
+            print(f"{k:<{width}}  {v}")
+
+def parse_args():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--updates", type=int, default=1000)
+    ap.add_argument("--connections", type=int, default=20, help="concurrent POSTs (Telegram uses up to 100)")
+    ap.add_argument("--tg-latency-ms", type=float, default=20.0, help="stub Telegram latency")
+    ap.add_argument("--json", action="store_true", help="print one JSON line")
+    return ap.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))